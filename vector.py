@@ -1,12 +1,27 @@
-from __future__ import division
-from collections import Sequence
-from math import acos, atan2, cos, pi, sin, sqrt
+from collections.abc import Sequence
+from itertools import repeat
+from math import acos, atan2, cos, hypot, pi, sin, sqrt
+from operator import add, floordiv, mul, neg, sub, truediv
 
 __all__ = ['IncompatibleDimensions', 'Vector']
 
 class IncompatibleDimensions(Exception):
     pass
 
+def _is_seq(o):
+    # True if o is a sequence. The common cases (tuples, lists and
+    # vectors) are tested first, as isinstance() with the Sequence ABC is
+    # comparatively slow. A mere __len__ and __getitem__ is not enough:
+    # mappings have those too.
+    return type(o) in (tuple, list) or isinstance(o, (tuple, Sequence))
+
+# Before Python 3.8, hypot() takes exactly two arguments.
+try:
+    hypot(1, 2, 3)
+    _variadic_hypot = True
+except TypeError:
+    _variadic_hypot = False
+
 class Vector(tuple):
     """Vector is a subclass of tuple representing a vector in two or more
     dimensions. You create a Vector by passing an iterable (that
@@ -70,6 +85,11 @@ class Vector(tuple):
         Traceback (most recent call last):
             ...
         IncompatibleDimensions: (2, 3)
+        >>> Vector(1, 2, 3) + (1, 2)
+        ... # doctest: +IGNORE_EXCEPTION_DETAIL
+        Traceback (most recent call last):
+            ...
+        IncompatibleDimensions: (3, 2)
 
     The magnitude property of a vector gives its magnitude, as does the
     abs() function:
@@ -93,6 +113,14 @@ class Vector(tuple):
         >>> Vector(1, 0, 0).angle_to((0, 1, 0)) / pi
         0.5
 
+    Rounding errors do not take the angle outside its range, even for
+    parallel vectors:
+
+        >>> v = Vector(6.715302078397393, -1.344658641898933,
+        ...            5.245601649158839, -9.957878932977787)
+        >>> v.angle_to(v * 4.509333221142534)
+        0.0
+
     The distance() method computes the distance between two points
     (expressed as vectors):
 
@@ -103,6 +131,11 @@ class Vector(tuple):
 
         >>> Vector(1, 2, 3).dot((3, 2, 1))
         10
+        >>> Vector(1, 2, 3).dot((3, 2, 1, 0))
+        ... # doctest: +IGNORE_EXCEPTION_DETAIL
+        Traceback (most recent call last):
+            ...
+        IncompatibleDimensions: (3, 4)
 
     The map() method applies a function to each element in the vector:
 
@@ -146,6 +179,11 @@ class Vector(tuple):
 
         >>> Vector(2, 1, 0).cross((3, 4, 0))
         Vector(0, 0, 5)
+        >>> Vector(2, 1, 0).cross((3, 4))
+        ... # doctest: +IGNORE_EXCEPTION_DETAIL
+        Traceback (most recent call last):
+            ...
+        IncompatibleDimensions: (3, 2)
 
 
     Two-dimensional vectors support four extra operations.
@@ -177,9 +215,34 @@ class Vector(tuple):
         Vector(1.414213562373..., 1.414213562373...)
 
     """
+    __slots__ = ()
+
     def __new__(cls, *args):
         if len(args) == 1: args = args[0]
-        return super(Vector, cls).__new__(cls, tuple(args))
+        t = tuple(args)
+        # type(v)(...) must give a vector of the right class even if v is
+        # one of the specialized subclasses.
+        if cls in (Vector, _Vector2, _Vector3):
+            n = len(t)
+            if n == 2:
+                cls = _Vector2
+            elif n == 3:
+                cls = _Vector3
+            else:
+                cls = Vector
+        return super(Vector, cls).__new__(cls, t)
+
+    @staticmethod
+    def _from_tuple(t):
+        # Return a Vector with the elements of the tuple t, of the class
+        # that Vector(t) would return, without the argument parsing and
+        # copying done by Vector.__new__.
+        n = len(t)
+        if n == 2:
+            return tuple.__new__(_Vector2, t)
+        elif n == 3:
+            return tuple.__new__(_Vector3, t)
+        return tuple.__new__(Vector, t)
 
     def __repr__(self):
         if len(self) == 1:
@@ -192,57 +255,84 @@ class Vector(tuple):
         if len(self) != len(other):
             raise IncompatibleDimensions(len(self), len(other))
 
+    def _dots(self, other):
+        # Return the tuple (self.dot(other), self.dot(self),
+        # other.dot(other)) computed in a single pass over the elements.
+        self._check_compatibility(other)
+        ab = aa = bb = 0
+        for v, w in zip(self, other):
+            ab += v * w
+            aa += v * v
+            bb += w * w
+        return ab, aa, bb
+
+    def _cross3_magnitude(self, other):
+        # Return abs(self.cross(other)) for three-dimensional vectors,
+        # without building the cross product as a Vector.
+        x0, y0, z0 = self
+        x1, y1, z1 = other
+        cx = y0 * z1 - z0 * y1
+        cy = z0 * x1 - x0 * z1
+        cz = x0 * y1 - y0 * x1
+        if _variadic_hypot:
+            return hypot(cx, cy, cz)
+        return sqrt(cx * cx + cy * cy + cz * cz)
+
     def _dimension_error(self, name):
         return ValueError('.{0}() is not implemented for {1}-dimensional '
                           'vectors.'.format(name, len(self)))
 
     def __add__(self, other):
-        if not isinstance(other, Sequence):
+        if not _is_seq(other):
             return NotImplemented
-        self._check_compatibility(other)
-        return Vector(v + w for v, w in zip(self, other))
+        if len(self) != len(other):
+            raise IncompatibleDimensions(len(self), len(other))
+        return self._from_tuple(tuple(map(add, self, other)))
 
     def __radd__(self, other):
-        if not isinstance(other, Sequence):
+        if not _is_seq(other):
             return NotImplemented
-        self._check_compatibility(other)
-        return Vector(w + v for v, w in zip(self, other))
+        if len(self) != len(other):
+            raise IncompatibleDimensions(len(self), len(other))
+        return self._from_tuple(tuple(map(add, other, self)))
 
     def __sub__(self, other):
-        if not isinstance(other, Sequence):
+        if not _is_seq(other):
             return NotImplemented
-        self._check_compatibility(other)
-        return Vector(v - w for v, w in zip(self, other))
+        if len(self) != len(other):
+            raise IncompatibleDimensions(len(self), len(other))
+        return self._from_tuple(tuple(map(sub, self, other)))
 
     def __rsub__(self, other):
-        if not isinstance(other, Sequence):
+        if not _is_seq(other):
             return NotImplemented
-        self._check_compatibility(other)
-        return Vector(w - v for v, w in zip(self, other))
+        if len(self) != len(other):
+            raise IncompatibleDimensions(len(self), len(other))
+        return self._from_tuple(tuple(map(sub, other, self)))
 
     def __mul__(self, s):
-        return Vector(v * s for v in self)
+        return self._from_tuple(tuple(map(mul, self, repeat(s))))
 
-    def __rmul__(self, s):
-        return Vector(v * s for v in self)
-
-    def __div__(self, s):
-        return Vector(v / s for v in self)
+    __rmul__ = __mul__
 
     def __truediv__(self, s):
-        return Vector(v / s for v in self)
+        return self._from_tuple(tuple(map(truediv, self, repeat(s))))
 
     def __floordiv__(self, s):
-        return Vector(v // s for v in self)
+        return self._from_tuple(tuple(map(floordiv, self, repeat(s))))
 
     def __neg__(self):
-        return self * -1
+        return self._from_tuple(tuple(map(neg, self)))
 
     def __pos__(self):
         return self
 
-    def __abs__(self):
-        return sqrt(self.magnitude_squared)
+    if _variadic_hypot:
+        def __abs__(self):
+            return hypot(*self)
+    else:
+        def __abs__(self):
+            return sqrt(self.magnitude_squared)
 
     @property
     def angle(self):
@@ -251,7 +341,8 @@ class Vector(tuple):
 
         """
         if len(self) == 2:
-            return atan2(self[1], self[0])
+            x, y = self
+            return atan2(y, x)
         else:
             raise self._dimension_error('angle')
 
@@ -260,27 +351,39 @@ class Vector(tuple):
         vector has magnitude zero, raise ZeroDivisionError.
 
         """
-        if len(self) in (2, 3):
+        n = len(self)
+        if n == 2:
             return atan2(abs(self.cross(other)), self.dot(other))
+        elif n == 3:
+            # dot() checks the dimensions before the cross product is
+            # computed.
+            d = self.dot(other)
+            return atan2(self._cross3_magnitude(other), d)
         else:
-            # We avoid other.magnitude_squared so that this works if
-            # other is a plain sequence rather than a Vector object.
-            return acos(self.dot(other)
-                        / sqrt(self.magnitude_squared
-                               * sum(v * v for v in other)))
+            ab, aa, bb = self._dots(other)
+            # Rounding can push the cosine slightly outside [-1, 1],
+            # where acos() would raise ValueError.
+            c = ab / sqrt(aa * bb)
+            return acos(-1.0 if c < -1.0 else 1.0 if c > 1.0 else c)
 
     def cross(self, other):
         """Return the cross product with another vector. For two-dimensional
         and three-dimensional vectors only.
 
         """
-        self._check_compatibility(other)
-        if len(self) == 2:
-            return self[0] * other[1] - self[1] * other[0]
-        elif len(self) == 3:
-            return Vector(self[1] * other[2] - self[2] * other[1],
-                          self[2] * other[0] - self[0] * other[2],
-                          self[0] * other[1] - self[1] * other[0])
+        n = len(self)
+        if n != len(other):
+            raise IncompatibleDimensions(n, len(other))
+        if n == 2:
+            x0, y0 = self
+            x1, y1 = other
+            return x0 * y1 - y0 * x1
+        elif n == 3:
+            x0, y0, z0 = self
+            x1, y1, z1 = other
+            return tuple.__new__(_Vector3, (y0 * z1 - z0 * y1,
+                                            z0 * x1 - x0 * z1,
+                                            x0 * y1 - y0 * x1))
         else:
             raise self._dimension_error('cross')
 
@@ -293,13 +396,19 @@ class Vector(tuple):
 
     def dot(self, other):
         """Return the dot product with the other vector."""
-        self._check_compatibility(other)
-        return sum(v * w for v, w in zip(self, other))
+        n = len(self)
+        if n != len(other):
+            raise IncompatibleDimensions(n, len(other))
+        if n == 4:
+            x0, y0, z0, w0 = self
+            x1, y1, z1, w1 = other
+            return x0 * x1 + y0 * y1 + z0 * z1 + w0 * w1
+        return sum(map(mul, self, other))
 
     @property
     def is_zero(self):
         """True if this vector has magnitude zero, False otherwise."""
-        return self.magnitude_squared == 0
+        return not any(self)
 
     @property
     def magnitude(self):
@@ -309,19 +418,23 @@ class Vector(tuple):
     @property
     def magnitude_squared(self):
         """The squared magnitude of the vector."""
-        return sum(v * v for v in self)
+        n = len(self)
+        if n == 4:
+            x, y, z, w = self
+            return x * x + y * y + z * z + w * w
+        return sum(map(mul, self, self))
 
     def map(self, f):
         """Return the vector whose elements are the result of applying the
         function f to the elements of this vector.
         
         """
-        return Vector(f(v) for v in self)
+        return self._from_tuple(tuple(map(f, self)))
 
     @property
     def non_zero(self):
         """False if this vector has magnitude zero, True otherwise."""
-        return self.magnitude_squared != 0
+        return any(self)
 
     def normalized(self):
         """Return a unit vector in the same direction as this vector. If this
@@ -336,7 +449,8 @@ class Vector(tuple):
 
         """
         if len(self) == 2:
-            return Vector(-self[1], self[0])
+            x, y = self
+            return tuple.__new__(_Vector2, (-y, x))
         else:
             raise self._dimension_error('perpendicular')
 
@@ -353,8 +467,9 @@ class Vector(tuple):
 
         """
         if len(self) == 2:
+            x, y = self
             s, c = sin(theta), cos(theta)
-            return Vector(self.dot((c, -s)), self.dot((s, c)))
+            return tuple.__new__(_Vector2, (x * c - y * s, x * s + y * c))
         else:
             raise self._dimension_error('rotated')
 
@@ -376,3 +491,232 @@ class Vector(tuple):
     @property
     def z(self):
         return self[2]
+
+
+# Vector() returns instances of these subclasses for two- and
+# three-dimensional vectors. They override the most heavily used
+# methods with unrolled versions that need no dispatch on the
+# dimension. They are not part of the interface: users should only
+# ever need to refer to Vector.
+
+def _inherit_docstrings(cls):
+    # Class decorator: copy the docstrings of the public methods and
+    # properties that cls overrides from Vector, so that help() gives the
+    # same text whatever the dimension of the vector.
+    for name, attr in list(vars(cls).items()):
+        if name.startswith('_') or attr.__doc__ is not None:
+            continue
+        doc = getattr(Vector, name).__doc__
+        if isinstance(attr, property):
+            setattr(cls, name, property(attr.fget, doc=doc))
+        else:
+            attr.__doc__ = doc
+    return cls
+
+@_inherit_docstrings
+class _Vector2(Vector):
+    __slots__ = ()
+
+    def __reduce__(self):
+        # Pickle as Vector so that pickles don't depend on this class.
+        return Vector, (tuple(self),)
+
+    def __add__(self, other):
+        if not _is_seq(other):
+            return NotImplemented
+        x0, y0 = self
+        try:
+            x1, y1 = other
+        except ValueError:
+            pass
+        else:
+            return tuple.__new__(_Vector2, (x0 + x1, y0 + y1))
+        raise IncompatibleDimensions(2, len(other))
+
+    def __radd__(self, other):
+        if not _is_seq(other):
+            return NotImplemented
+        x0, y0 = self
+        try:
+            x1, y1 = other
+        except ValueError:
+            pass
+        else:
+            return tuple.__new__(_Vector2, (x1 + x0, y1 + y0))
+        raise IncompatibleDimensions(2, len(other))
+
+    def __sub__(self, other):
+        if not _is_seq(other):
+            return NotImplemented
+        x0, y0 = self
+        try:
+            x1, y1 = other
+        except ValueError:
+            pass
+        else:
+            return tuple.__new__(_Vector2, (x0 - x1, y0 - y1))
+        raise IncompatibleDimensions(2, len(other))
+
+    def __rsub__(self, other):
+        if not _is_seq(other):
+            return NotImplemented
+        x0, y0 = self
+        try:
+            x1, y1 = other
+        except ValueError:
+            pass
+        else:
+            return tuple.__new__(_Vector2, (x1 - x0, y1 - y0))
+        raise IncompatibleDimensions(2, len(other))
+
+    def __mul__(self, s):
+        x, y = self
+        return tuple.__new__(_Vector2, (x * s, y * s))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, s):
+        x, y = self
+        return tuple.__new__(_Vector2, (x / s, y / s))
+
+    def __floordiv__(self, s):
+        x, y = self
+        return tuple.__new__(_Vector2, (x // s, y // s))
+
+    def __neg__(self):
+        x, y = self
+        return tuple.__new__(_Vector2, (-x, -y))
+
+    @property
+    def angle(self):
+        x, y = self
+        return atan2(y, x)
+
+    def cross(self, other):
+        if len(other) != 2:
+            raise IncompatibleDimensions(2, len(other))
+        x0, y0 = self
+        x1, y1 = other
+        return x0 * y1 - y0 * x1
+
+    def dot(self, other):
+        if len(other) != 2:
+            raise IncompatibleDimensions(2, len(other))
+        x0, y0 = self
+        x1, y1 = other
+        return x0 * x1 + y0 * y1
+
+    @property
+    def magnitude_squared(self):
+        x, y = self
+        return x * x + y * y
+
+    def perpendicular(self):
+        x, y = self
+        return tuple.__new__(_Vector2, (-y, x))
+
+    def rotated(self, theta):
+        x, y = self
+        s, c = sin(theta), cos(theta)
+        return tuple.__new__(_Vector2, (x * c - y * s, x * s + y * c))
+
+@_inherit_docstrings
+class _Vector3(Vector):
+    __slots__ = ()
+
+    def __reduce__(self):
+        # Pickle as Vector so that pickles don't depend on this class.
+        return Vector, (tuple(self),)
+
+    def __add__(self, other):
+        if not _is_seq(other):
+            return NotImplemented
+        x0, y0, z0 = self
+        try:
+            x1, y1, z1 = other
+        except ValueError:
+            pass
+        else:
+            return tuple.__new__(_Vector3, (x0 + x1, y0 + y1, z0 + z1))
+        raise IncompatibleDimensions(3, len(other))
+
+    def __radd__(self, other):
+        if not _is_seq(other):
+            return NotImplemented
+        x0, y0, z0 = self
+        try:
+            x1, y1, z1 = other
+        except ValueError:
+            pass
+        else:
+            return tuple.__new__(_Vector3, (x1 + x0, y1 + y0, z1 + z0))
+        raise IncompatibleDimensions(3, len(other))
+
+    def __sub__(self, other):
+        if not _is_seq(other):
+            return NotImplemented
+        x0, y0, z0 = self
+        try:
+            x1, y1, z1 = other
+        except ValueError:
+            pass
+        else:
+            return tuple.__new__(_Vector3, (x0 - x1, y0 - y1, z0 - z1))
+        raise IncompatibleDimensions(3, len(other))
+
+    def __rsub__(self, other):
+        if not _is_seq(other):
+            return NotImplemented
+        x0, y0, z0 = self
+        try:
+            x1, y1, z1 = other
+        except ValueError:
+            pass
+        else:
+            return tuple.__new__(_Vector3, (x1 - x0, y1 - y0, z1 - z0))
+        raise IncompatibleDimensions(3, len(other))
+
+    def __mul__(self, s):
+        x, y, z = self
+        return tuple.__new__(_Vector3, (x * s, y * s, z * s))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, s):
+        x, y, z = self
+        return tuple.__new__(_Vector3, (x / s, y / s, z / s))
+
+    def __floordiv__(self, s):
+        x, y, z = self
+        return tuple.__new__(_Vector3, (x // s, y // s, z // s))
+
+    def __neg__(self):
+        x, y, z = self
+        return tuple.__new__(_Vector3, (-x, -y, -z))
+
+    def cross(self, other):
+        if len(other) != 3:
+            raise IncompatibleDimensions(3, len(other))
+        x0, y0, z0 = self
+        x1, y1, z1 = other
+        return tuple.__new__(_Vector3, (y0 * z1 - z0 * y1,
+                                        z0 * x1 - x0 * z1,
+                                        x0 * y1 - y0 * x1))
+
+    def dot(self, other):
+        if len(other) != 3:
+            raise IncompatibleDimensions(3, len(other))
+        x0, y0, z0 = self
+        x1, y1, z1 = other
+        return x0 * x1 + y0 * y1 + z0 * z1
+
+    @property
+    def magnitude_squared(self):
+        x, y, z = self
+        return x * x + y * y + z * z
+
+# Present the specialized classes as Vector in reprs and error messages.
+# (Pickling is unaffected: see __reduce__.)
+for _cls in (_Vector2, _Vector3):
+    _cls.__name__ = _cls.__qualname__ = 'Vector'
+del _cls